@@ -1,20 +1,46 @@
 """Visualize schemas."""
 
+import argparse
 import dataclasses
+import hashlib
 import importlib
+import importlib.util
 import inspect
-import re
+import itertools
+import logging
+import os
+import pickle
 import sys
+from collections import deque
 from enum import Enum
-from typing import Any, Dict, List, Union, get_args, get_origin
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType, UnionType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 import pydantic
 import pygraphviz as pgv  # type: ignore
 from pydantic.fields import FieldInfo
 from pydantic_core import PydanticUndefined
 
-# Define built-in types to exclude
-BUILTIN_TYPES = set(sys.builtin_module_names) | {
+logger = logging.getLogger(__name__)
+
+# Define built-in types to exclude; interned so membership tests can match by identity
+_BUILTIN_TYPE_NAMES = set(sys.builtin_module_names) | {
     "int",
     "str",
     "float",
@@ -48,253 +74,668 @@ BUILTIN_TYPES = set(sys.builtin_module_names) | {
     "classmethod",
     "function",
 }
+BUILTIN_TYPES = frozenset(sys.intern(name) for name in _BUILTIN_TYPE_NAMES)
+
+_NONE_TYPE = type(None)
+
+# Logging ``extra`` marking a failure that may not recur on the next run, such as
+# a failed import; a class map built with one is not cached
+_TRANSIENT = {"transient": True}
+
+
+def _is_stdlib_class(cls: type) -> bool:
+    """Tell whether a class is defined in the standard library."""
+    return cls.__module__.partition(".")[0] in sys.stdlib_module_names
+
+
+class _SanitizeTable(dict):
+    """str.translate table mapping every character outside [a-zA-Z0-9_] to '_'."""
 
+    def __missing__(self, codepoint: int) -> Union[int, str]:
+        char = chr(codepoint)
+        allowed = char.isascii() and (char.isalnum() or char == "_")
+        value = codepoint if allowed else "_"
+        self[codepoint] = value
+        return value
 
+
+_SANITIZE_TABLE = _SanitizeTable()
+
+
+@lru_cache(maxsize=None)
 def sanitize_name(name: str) -> str:
     """Sanitize class and field names to be Graphviz-friendly."""
-    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+    return name.translate(_SANITIZE_TABLE)
+
+
+class ParsedType(NamedTuple):
+    """Parsed representation of a field annotation."""
+
+    display: str
+    types: Tuple[str, ...]
 
 
-def parse_field_type(field_type: Any) -> Dict:
+def _parse_union(args: Tuple[Any, ...]) -> ParsedType:
+    """Parse the arguments of a ``Union`` (or ``Optional``) annotation."""
+    type_names: List[str] = []
+    type_displays = []
+    for arg in args:
+        if arg is _NONE_TYPE:
+            type_names.append("NoneType")
+            type_displays.append("None")
+        else:
+            result = parse_field_type(arg)
+            type_names.extend(result.types)
+            type_displays.append(result.display)
+    if len(args) == 2 and _NONE_TYPE in args:
+        # It's an Optional
+        non_none_types = [t for t in args if t is not _NONE_TYPE]
+        result = parse_field_type(non_none_types[0])
+        display = f"Optional[{result.display}]"
+    else:
+        display = "Union[" + ", ".join(type_displays) + "]"
+    return ParsedType(display, tuple(dict.fromkeys(type_names)))
+
+
+def _parse_list(args: Tuple[Any, ...]) -> ParsedType:
+    """Parse the arguments of a ``List`` annotation."""
+    if args:
+        result = parse_field_type(args[0])
+        return ParsedType(f"List[{result.display}]", result.types)
+    return ParsedType("List", ())
+
+
+def _parse_dict(args: Tuple[Any, ...]) -> ParsedType:
+    """Parse the arguments of a ``Dict`` annotation."""
+    if len(args) == 2:
+        key_result = parse_field_type(args[0])
+        value_result = parse_field_type(args[1])
+        display = f"Dict[{key_result.display}, {value_result.display}]"
+        types = tuple(dict.fromkeys(key_result.types + value_result.types))
+        return ParsedType(display, types)
+    return ParsedType("Dict", ())
+
+
+def _parse_tuple(args: Tuple[Any, ...]) -> ParsedType:
+    """Parse the arguments of a ``Tuple`` annotation, fixed-length or variadic."""
+    if not args or args == ((),):
+        return ParsedType("Tuple", ())
+    if len(args) == 2 and args[1] is Ellipsis:
+        result = parse_field_type(args[0])
+        return ParsedType(f"Tuple[{result.display}, ...]", result.types)
+    results = [parse_field_type(arg) for arg in args]
+    display = "Tuple[" + ", ".join(result.display for result in results) + "]"
+    types = tuple(dict.fromkeys(name for result in results for name in result.types))
+    return ParsedType(display, types)
+
+
+# get_origin() normalizes typing aliases (List, Dict) to their builtin origins;
+# PEP 604 unions (X | Y) have their own origin but parse like Union
+_ORIGIN_PARSERS: Dict[Any, Callable[[Tuple[Any, ...]], ParsedType]] = {
+    Union: _parse_union,
+    UnionType: _parse_union,
+    list: _parse_list,
+    tuple: _parse_tuple,
+    dict: _parse_dict,
+}
+
+
+def parse_field_type(field_type: Any) -> ParsedType:
     """
     Parse the field type to handle Optional and Union types.
 
-    Returns a dictionary with:
+    Results are cached on the (hashable) annotation object, so an annotation
+    such as ``Optional[int]`` shared across many models is only parsed once.
+    Unhashable annotations, such as ``Annotated`` with dict metadata, are
+    parsed without the cache.
+
+    Returns a ParsedType with:
     - 'display': The string representation of the type for display.
-    - 'types': A list of base type names for creating edges.
+    - 'types': A tuple of distinct base type names for creating edges.
     """
-    origin = get_origin(field_type)
-    args = get_args(field_type)
-
-    if origin is Union:
-        type_names = []
-        type_displays = []
-        for arg in args:
-            if arg is type(None):
-                type_names.append("NoneType")
-                type_displays.append("None")
-            else:
-                result = parse_field_type(arg)
-                type_names.extend(result["types"])
-                type_displays.append(result["display"])
-        if len(args) == 2 and type(None) in args:
-            # It's an Optional
-            non_none_types = [t for t in args if t is not type(None)]
-            result = parse_field_type(non_none_types[0])
-            display = f"Optional[{result['display']}]"
-        else:
-            display = "Union[" + ", ".join(type_displays) + "]"
-        return {"display": display, "types": type_names}
-    elif origin in [list, List]:
-        if args:
-            result = parse_field_type(args[0])
-            display = f'List[{result["display"]}]'
-            return {"display": display, "types": result["types"]}
-        else:
-            return {"display": "List", "types": []}
-    elif origin in [dict, Dict]:
-        if args and len(args) == 2:
-            key_result = parse_field_type(args[0])
-            value_result = parse_field_type(args[1])
-            display = f'Dict[{key_result["display"]}, {value_result["display"]}]'
-            types = key_result["types"] + value_result["types"]
-            return {"display": display, "types": types}
+    try:
+        return _parse_field_type_cached(field_type)
+    except TypeError:
+        return _parse_field_type(field_type)
+
+
+def _parse_field_type(field_type: Any) -> ParsedType:
+    """Parse a field type; see parse_field_type."""
+    # Plain classes, the most common annotation, have no origin to dispatch on;
+    # only subscripted generics carry __origin__, apart from X | Y unions
+    if getattr(field_type, "__origin__", None) is not None or isinstance(
+        field_type, UnionType
+    ):
+        parser = _ORIGIN_PARSERS.get(get_origin(field_type))
+        if parser is not None:
+            return parser(get_args(field_type))
+    if hasattr(field_type, "__name__"):
+        type_name = field_type.__name__
+        return ParsedType(type_name, (type_name,))
+    return ParsedType(str(field_type), ())
+
+
+_parse_field_type_cached = lru_cache(maxsize=None)(_parse_field_type)
+
+
+@dataclasses.dataclass(slots=True)
+class FieldEntry:
+    """A field (or enum member) of a class as shown in its node."""
+
+    type_display: str
+    type_bases: Tuple[str, ...]
+    default: Any = None
+    has_default: bool = False
+
+
+@dataclasses.dataclass(slots=True)
+class ClassEntry:
+    """A class in the class map with its fields and origin."""
+
+    fields: Dict[str, FieldEntry]
+    module: Optional[str]
+    local: bool
+    is_enum: bool
+    # Referenced but deliberately not followed (skip_types or standard library);
+    # recorded so the diagram leaves it out without a missing-node warning
+    skipped: bool = False
+
+
+class ClassKind(Enum):
+    """Kind of class, deciding how its fields are extracted."""
+
+    PYDANTIC = "pydantic"
+    DATACLASS = "dataclass"
+    ENUM = "enum"
+    REGULAR = "regular"
+
+
+@lru_cache(maxsize=None)
+def _classify(cls: type) -> ClassKind:
+    """Classify a class once so its MRO is not probed again for every check."""
+    if (
+        pydantic
+        and issubclass(cls, pydantic.BaseModel)
+        and hasattr(cls, "model_fields")
+    ):
+        return ClassKind.PYDANTIC
+    if dataclasses.is_dataclass(cls):
+        return ClassKind.DATACLASS
+    if issubclass(cls, Enum):
+        return ClassKind.ENUM
+    return ClassKind.REGULAR
+
+
+@lru_cache(maxsize=None)
+def _class_annotations(cls: type) -> Dict[str, Any]:
+    """
+    Return the annotations declared on a class itself, read once per class.
+
+    String annotations (forward references, or any annotation under
+    ``from __future__ import annotations``) are evaluated one by one in the
+    class's module and namespace; any that cannot be are kept as strings.
+    """
+    annotations = inspect.get_annotations(cls)
+    module = sys.modules.get(cls.__module__)
+    module_globals = getattr(module, "__dict__", {})
+    class_ns = dict(vars(cls))
+    for name, ann in annotations.items():
+        if isinstance(ann, str):
+            try:
+                annotations[name] = eval(ann, module_globals, class_ns)
+            except Exception:
+                pass
+    return annotations
+
+
+@lru_cache(maxsize=None)
+def _dataclass_type_hints(cls: type) -> Dict[str, Any]:
+    """
+    Return the evaluated field types of a dataclass, inherited ones included.
+
+    If any annotation cannot be evaluated, each class in the MRO is read through
+    _class_annotations instead, so only the failing fields stay strings.
+    """
+    try:
+        return get_type_hints(cls)
+    except Exception:
+        hints: Dict[str, Any] = {}
+        for base in reversed(cls.__mro__):
+            hints.update(_class_annotations(base))
+        return hints
+
+
+@lru_cache(maxsize=None)
+def _safe_import(module_name: str) -> Optional[ModuleType]:
+    """Import a module if a spec for it exists, caching failures as None."""
+    try:
+        if importlib.util.find_spec(module_name) is None:
+            return None
+        return importlib.import_module(module_name)
+    except Exception as e:
+        logger.warning(
+            "Error importing module %s: %s", module_name, e, extra=_TRANSIENT
+        )
+        return None
+
+
+@lru_cache(maxsize=None)
+def _resolve_class(hint_module_name: str, base_type_name: str) -> Optional[type]:
+    """
+    Resolve a type name referenced from a module to the class it names.
+
+    The referencing module is checked first, then a module named after the type.
+    Failed lookups are cached as None, and the fallback import is shared across
+    referencing modules through _safe_import.
+    """
+    candidate = getattr(sys.modules.get(hint_module_name), base_type_name, None)
+    if isinstance(candidate, type):
+        return candidate
+    candidate = getattr(_safe_import(base_type_name), base_type_name, None)
+    return candidate if isinstance(candidate, type) else None
+
+
+def _pydantic_fields(cls: Any, fields: Dict[str, FieldEntry]) -> None:
+    """Fill ``fields`` from a pydantic v2 model."""
+    field_info: FieldInfo
+    for field_name, field_info in cls.model_fields.items():
+        type_info = parse_field_type(field_info.annotation)
+        # Determine if the field has a default value or default factory
+        if field_info.default_factory is not None:
+            has_default, default_value = True, "default_factory"
         else:
-            return {"display": "Dict", "types": []}
-    else:
-        if hasattr(field_type, "__name__"):
-            type_name = field_type.__name__
-            return {"display": type_name, "types": [type_name]}
+            has_default = field_info.default is not PydanticUndefined
+            default_value = field_info.default if has_default else None
+        fields[field_name] = FieldEntry(
+            type_info.display, type_info.types, default_value, has_default
+        )
+        logger.debug(
+            "Processed Pydantic field: %s.%s = %r (has_default=%s)",
+            cls.__name__,
+            field_name,
+            default_value,
+            has_default,
+        )
+
+
+def _dataclass_fields(cls: Any, fields: Dict[str, FieldEntry]) -> None:
+    """Fill ``fields`` from a dataclass."""
+    # field.type is the raw annotation, which may be a string
+    type_hints = _dataclass_type_hints(cls)
+    for field in dataclasses.fields(cls):
+        field_name = field.name
+        type_info = parse_field_type(type_hints.get(field_name, field.type))
+        if field.default_factory is not dataclasses.MISSING:
+            has_default, default_value = True, "default_factory"
         else:
-            return {"display": str(field_type), "types": []}
+            has_default = field.default is not dataclasses.MISSING
+            default_value = field.default if has_default else None
+        fields[field_name] = FieldEntry(
+            type_info.display, type_info.types, default_value, has_default
+        )
+        logger.debug(
+            "Processed Dataclass field: %s.%s = %r (has_default=%s)",
+            cls.__name__,
+            field_name,
+            default_value,
+            has_default,
+        )
+
+
+def _enum_fields(cls: Any, fields: Dict[str, FieldEntry]) -> None:
+    """Fill ``fields`` with the members of an Enum."""
+    for member_name in cls.__members__:
+        fields[member_name] = FieldEntry("", ())
+        logger.debug("Processed Enum member: %s.%s", cls.__name__, member_name)
+
+
+def _regular_fields(cls: Any, fields: Dict[str, FieldEntry]) -> None:
+    """Fill ``fields`` from the public annotations of a regular class."""
+    # Read defaults from the class namespace so descriptors are never invoked
+    class_dict = cls.__dict__
+    for field_name, field_type in _class_annotations(cls).items():
+        type_info = parse_field_type(field_type)
+        has_default = field_name in class_dict
+        default_value = class_dict[field_name] if has_default else None
+        fields[field_name] = FieldEntry(
+            type_info.display, type_info.types, default_value, has_default
+        )
+        logger.debug(
+            "Processed Regular class field: %s.%s = %r (has_default=%s)",
+            cls.__name__,
+            field_name,
+            default_value,
+            has_default,
+        )
+
+
+# Field extraction strategy for each kind of class
+_FIELD_EXTRACTORS: Dict[ClassKind, Callable[[Any, Dict[str, FieldEntry]], None]] = {
+    ClassKind.PYDANTIC: _pydantic_fields,
+    ClassKind.DATACLASS: _dataclass_fields,
+    ClassKind.ENUM: _enum_fields,
+    ClassKind.REGULAR: _regular_fields,
+}
 
 
-def build_class_map(module_names: List[str]) -> Dict[str, Dict]:  # noqa C901
+def build_class_map(  # noqa C901
+    module_names: List[str], skip_types: Iterable[str] = ()
+) -> Dict[str, ClassEntry]:
     """
     Build a mapping of classes to their fields, types, default values, and origin.
 
     Args:
         module_names (List[str]): List of module names to process.
+        skip_types (Iterable[str]): Extra type names not to follow, on top of
+            the built-in types and standard library classes. Skipped types are
+            recorded in the result with ``skipped`` set.
 
     Returns:
-        Dict[str, Dict]: A mapping of class names to their metadata.
+        Dict[str, ClassEntry]: A mapping of class names to their metadata.
     """
-    class_map = {}
-    visited_classes = set()
-
-    def process_class(cls: Any) -> None:
-        class_name = cls.__name__
-        if class_name in visited_classes or class_name in BUILTIN_TYPES:
-            return
+    class_map: Dict[str, ClassEntry] = {}
+    # Seeded with the built-in names so one lookup covers both checks
+    visited_classes = set(BUILTIN_TYPES)
+    # Class identities already handed to process_class, since the same class can
+    # be queued more than once and a different class can share a mapped name
+    seen_class_ids: Set[int] = set()
+    module_set = frozenset(module_names)
+    skipped_types = frozenset(skip_types)
+    local_classes: Dict[str, type] = {}
+
+    def process_class(cls: Any) -> List[type]:
+        """Record a class in class_map and return the classes its fields reference."""
+        class_id = id(cls)
+        if class_id in seen_class_ids:
+            return []
+        seen_class_ids.add(class_id)
+        class_name = sys.intern(cls.__name__)
+        if class_name in visited_classes:
+            existing = class_map.get(class_name)
+            # A skipped reference doesn't block a class of the same name
+            if existing is None or not existing.skipped:
+                if existing is not None:
+                    logger.warning(
+                        "Skipping %s.%s: %s.%s is already mapped under that name",
+                        cls.__module__,
+                        class_name,
+                        existing.module,
+                        class_name,
+                    )
+                return []
         visited_classes.add(class_name)
-        fields = {}
+        if cls.__module__ not in module_set and _is_stdlib_class(cls):
+            logger.debug("Skipping standard library class %s", class_name)
+            class_map[class_name] = ClassEntry(
+                fields={},
+                module=cls.__module__,
+                local=False,
+                is_enum=False,
+                skipped=True,
+            )
+            return []
+        kind = _classify(cls)
+        is_enum = kind is ClassKind.ENUM
+        fields: Dict[str, FieldEntry] = {}
         try:
-            # Debug: Print class hierarchy
-            print(f"Processing class: {class_name}")
-            print(f"Class {class_name} MRO: {[base.__name__ for base in cls.__mro__]}")
-
-            if (
-                pydantic
-                and issubclass(cls, pydantic.BaseModel)
-                and hasattr(cls, "model_fields")
-            ):
-                # Pydantic v2 model
-                print(f"Identified {class_name} as Pydantic BaseModel (v2)")
-                annotations = cls.__annotations__
-                for field_name, field_type in annotations.items():
-                    type_info = parse_field_type(field_type)
-                    field_info: FieldInfo = cls.model_fields.get(field_name)
-                    if field_info:
-                        # Determine if the field has a default value or default factory
-                        if field_info.default is not PydanticUndefined:
-                            default_value = field_info.default
-                            has_default = True
-                        else:
-                            default_value = None
-                            has_default = False
-                        fields[field_name] = {
-                            "type": type_info,
-                            "default": default_value,
-                            "has_default": has_default,
-                        }
-                        print(
-                            f"Processed Pydantic field: {class_name}.{field_name} = {default_value} \
-                                (has_default={has_default})"
-                        )
-                    else:
-                        fields[field_name] = {
-                            "type": type_info,
-                            "default": None,
-                            "has_default": False,
-                        }
-                        print(
-                            f"Processed Pydantic field: {class_name}.{field_name} = None (has_default=False)"
-                        )
-            elif dataclasses.is_dataclass(cls):
-                # Dataclass
-                print(f"Identified {class_name} as Dataclass")
-                for field in dataclasses.fields(cls):
-                    field_name = field.name
-                    field_type = field.type
-                    type_info = parse_field_type(field_type)
-                    default_value = (
-                        field.default
-                        if field.default is not dataclasses.MISSING
-                        else None
-                    )
-                    has_default = field.default is not dataclasses.MISSING
-                    fields[field_name] = {
-                        "type": type_info,
-                        "default": default_value,
-                        "has_default": has_default,
-                    }
-                    print(
-                        f"Processed Dataclass field: {class_name}.{field_name} = {default_value} \
-                            (has_default={has_default})"
-                    )
-            elif issubclass(cls, Enum):
-                # Enum class
-                print(f"Identified {class_name} as Enum")
-                # Extract enum members
-                members = list(cls.__members__.keys())
-                for member_name in members:
-                    fields[member_name] = {
-                        "type": {"display": "", "types": []},
-                        "default": None,
-                        "has_default": False,
-                    }
-                    print(f"Processed Enum member: {class_name}.{member_name}")
-            else:
-                # Regular class - extract public annotations
-                print(f"Identified {class_name} as Regular class")
-                annotations = getattr(cls, "__annotations__", {})
-                for field_name, field_type in annotations.items():
-                    type_info = parse_field_type(field_type)
-                    default_value = getattr(cls, field_name, None)
-                    has_default = hasattr(cls, field_name)
-                    fields[field_name] = {
-                        "type": type_info,
-                        "default": default_value,
-                        "has_default": has_default,
-                    }
-                    print(
-                        f"Processed Regular class field: {class_name}.{field_name} = {default_value} \
-                            (has_default={has_default})"
-                    )
+            logger.debug("Processing class: %s", class_name)
+            logger.debug("Class %s MRO: %s", class_name, cls.__mro__)
+
+            logger.debug("Identified %s as %s class", class_name, kind.value)
+            _FIELD_EXTRACTORS[kind](cls, fields)
         except Exception as e:
-            print(f"Error processing class {class_name}: {e}")
+            logger.warning("Error processing class %s: %s", class_name, e)
 
-        class_map[class_name] = {
-            "fields": fields,
-            "module": cls.__module__,
-            "local": cls.__module__ in module_names,
-            "is_enum": issubclass(cls, Enum),
-        }
+        class_map[class_name] = ClassEntry(
+            fields=fields,
+            module=cls.__module__,
+            local=cls.__module__ in module_set,
+            is_enum=is_enum,
+        )
 
+        referenced: List[type] = []
         # Enums don't have field types to process further
-        if not issubclass(cls, Enum):
-            # Recursively process field types
+        if not is_enum:
+            hint_module = sys.modules.get(cls.__module__)
+            # Collect field types for the worklist
             for field_info_others in fields.values():
-                for base_type_name in field_info_others["type"]["types"]:
-                    if (
-                        base_type_name
-                        and base_type_name not in visited_classes
-                        and base_type_name not in BUILTIN_TYPES
-                    ):
-                        try:
-                            base_cls = None
-                            if base_type_name in sys.modules:
-                                base_cls = sys.modules[base_type_name]
-                            else:
-                                # Attempt to get the class from the current module
-                                current_module = sys.modules.get(cls.__module__)
-                                if current_module and hasattr(
-                                    current_module, base_type_name
-                                ):
-                                    base_cls = getattr(current_module, base_type_name)
-                            if base_cls is None:
-                                # Attempt to import the class assuming the module name is the same as the class name
-                                base_cls = getattr(
-                                    importlib.import_module(base_type_name),
-                                    base_type_name,
-                                )
-                            if base_cls:
-                                process_class(base_cls)
-                        except Exception as e:
-                            print(f"Error importing class {base_type_name}: {e}")
-                            if base_type_name not in class_map:
-                                class_map[base_type_name] = {
-                                    "fields": {},
-                                    "module": None,
-                                    "local": False,
-                                    "is_enum": False,
-                                }
-
-    # Import the specified modules and process their classes
+                for base_type_name in field_info_others.type_bases:
+                    if not base_type_name or base_type_name in visited_classes:
+                        continue
+                    if base_type_name in skipped_types:
+                        visited_classes.add(base_type_name)
+                        class_map[base_type_name] = ClassEntry(
+                            fields={},
+                            module=None,
+                            local=False,
+                            is_enum=False,
+                            skipped=True,
+                        )
+                        continue
+                    # The referencing module's own binding wins over a requested
+                    # module's class that merely shares the name
+                    base_cls = getattr(hint_module, base_type_name, None)
+                    if not isinstance(base_cls, type):
+                        base_cls = local_classes.get(base_type_name) or _resolve_class(
+                            cls.__module__, base_type_name
+                        )
+                    if base_cls is not None:
+                        referenced.append(base_cls)
+                    elif base_type_name not in class_map:
+                        logger.warning("Could not resolve class %s", base_type_name)
+                        class_map[base_type_name] = ClassEntry(
+                            fields={}, module=None, local=False, is_enum=False
+                        )
+        return referenced
+
+    # Import the specified modules, indexing the classes they define by name so
+    # references a module doesn't bind itself resolve without _resolve_class
+    module_roots: List[List[type]] = []
     for module_name in module_names:
         try:
             module = importlib.import_module(module_name)
-            for _, obj in inspect.getmembers(module, inspect.isclass):
-                if obj.__module__ == module.__name__:
-                    process_class(obj)
         except Exception as e:
-            print(f"Failed to import module {module_name}: {e}")
+            logger.warning(
+                "Failed to import module %s: %s", module_name, e, extra=_TRANSIENT
+            )
+            continue
+        mod_name = module.__name__
+        # Classes defined in the module itself, in definition order
+        roots = [
+            obj
+            for obj in vars(module).values()
+            if isinstance(obj, type) and obj.__module__ == mod_name
+        ]
+        for obj in roots:
+            local_classes.setdefault(obj.__name__, obj)
+        module_roots.append(roots)
+
+    # Process each module's classes and everything they reference
+    for roots in module_roots:
+        worklist = deque(roots)
+        while worklist:
+            worklist.extend(process_class(worklist.popleft()))
+
+    return class_map
 
+
+_CACHE_DIR = ".schema_viz_cache"
+_CACHE_FILE = "class_map.pkl"
+# Holds the key of the pickled class map, so a stale map is never unpickled
+_CACHE_KEY_FILE = "class_map.key"
+
+
+def _source_files(module_names: List[str]) -> List[str]:
+    """
+    List the source files a class map built from ``module_names`` depends on.
+
+    This is every .py file in the top-level packages of the requested modules,
+    plus this script, located without importing anything.
+    """
+    files = {os.path.abspath(__file__)}
+    for top_level in dict.fromkeys(name.partition(".")[0] for name in module_names):
+        try:
+            spec = importlib.util.find_spec(top_level)
+        except (ImportError, ValueError):
+            continue
+        if spec is None:
+            continue
+        if spec.submodule_search_locations:
+            for location in spec.submodule_search_locations:
+                files.update(str(path) for path in Path(location).rglob("*.py"))
+        elif spec.origin and spec.origin.endswith(".py"):
+            files.add(spec.origin)
+    return sorted(files)
+
+
+def _cache_key(module_names: List[str], skip_types: Iterable[str]) -> str:
+    """Hash the inputs of build_class_map together with its sources' mtimes."""
+    stamps = []
+    for path in _source_files(module_names):
+        try:
+            stamps.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            continue
+    payload = repr((sys.version_info[:2], module_names, sorted(skip_types), stamps))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class _TransientFailureCounter(logging.Handler):
+    """Count the transient failures logged while it is attached."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if getattr(record, "transient", False):
+            self.count += 1
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write a file through a temporary file, so readers never see it partial."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_class_map(
+    module_names: List[str],
+    skip_types: Iterable[str] = (),
+    cache_dir: str = _CACHE_DIR,
+) -> Dict[str, ClassEntry]:
+    """
+    Return build_class_map(module_names, skip_types), reusing a pickled result.
+
+    The cached class map is reused while no source file of the requested
+    packages (nor this script) has changed since it was written. Changes to
+    other modules they import, such as a sibling or third-party package, are
+    not detected; pass --no-cache to rebuild after those. A build in which an
+    import failed is not cached, while unresolved references are.
+
+    Args:
+        module_names (List[str]): List of module names to process.
+        skip_types (Iterable[str]): Extra type names not to follow.
+        cache_dir (str): Directory holding the cached class map.
+
+    Returns:
+        Dict[str, ClassEntry]: A mapping of class names to their metadata.
+    """
+    skip_types = tuple(skip_types)
+    key = _cache_key(module_names, skip_types)
+    cache_path = os.path.join(cache_dir, _CACHE_FILE)
+    key_path = os.path.join(cache_dir, _CACHE_KEY_FILE)
+    try:
+        with open(key_path, encoding="utf-8") as f:
+            cached_key = f.read()
+        if cached_key == key:
+            with open(cache_path, "rb") as f:
+                class_map = pickle.load(f)
+            logger.debug("Using cached class map from %s", cache_path)
+            return class_map
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.debug("Ignoring unreadable class map cache %s: %s", cache_path, e)
+
+    failures = _TransientFailureCounter()
+    logger.addHandler(failures)
+    try:
+        class_map = build_class_map(module_names, skip_types)
+    finally:
+        logger.removeHandler(failures)
+    if failures.count:
+        # A failed import may succeed on the next run
+        logger.debug("Not caching class map: %d failed imports", failures.count)
+        return class_map
+    try:
+        data = pickle.dumps(class_map)
+    except Exception as e:
+        # Field defaults can be arbitrary objects, not all of them picklable
+        logger.debug("Not caching class map: %s", e)
+        return class_map
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop the old key first, so the new map is never read under it
+        if os.path.exists(key_path):
+            os.remove(key_path)
+        _write_atomic(cache_path, data)
+        _write_atomic(key_path, key.encode("utf-8"))
+    except OSError as e:
+        logger.warning("Could not write class map cache %s: %s", cache_path, e)
     return class_map
 
 
+# Past this many nodes, sfdp replaces dot as the default engine, and fast mode
+# (capped dot network-simplex and crossing-minimization iterations) is on by
+# default; either way the layout is less tidy but far cheaper to compute
+_LARGE_GRAPH_NODES = 200
+_LARGE_GRAPH_ATTRS = "nslimit=1, nslimit1=1, mclimit=0.5"
+
+
+# Escapes for text interpolated into HTML-like node labels
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def _dot_quote(text: str) -> str:
+    """Quote text as a DOT string literal."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
 def visualize_schemas(  # noqa C901
-    class_map: Dict[str, Dict],
-    filename: str = "./genai_myah_chat_service/schema/schema_viz/schemas.png",
+    class_map: Dict[str, ClassEntry],
+    filename: str = "schemas.svg",
+    fast: Optional[bool] = None,
+    engine: Optional[str] = None,
+    output_format: Optional[str] = None,
 ) -> None:
     """
     Visualize the class schemas using Graphviz.
 
     Args:
-        class_map (Dict[str, Dict]): The class mapping to visualize.
+        class_map (Dict[str, ClassEntry]): The class mapping to visualize.
+        fast (Optional[bool]): Cap dot's layout iterations for a quicker but less
+            tidy layout. Defaults to doing so only for large class maps.
+        engine (Optional[str]): Graphviz layout program. Defaults to "dot", or to
+            "sfdp" for large class maps.
+        output_format (Optional[str]): Graphviz output format, such as "svg" or
+            "png". Defaults to the one named by the filename extension.
     """
-    G = pgv.AGraph(directed=True, strict=False, rankdir="LR")
-    module_colors = {}
+    dot_lines = [
+        "digraph {",
+        'graph [rankdir=LR, label="Schemas Diagram", labelloc=t];',
+    ]
+    # Skipped types get neither a node nor edges
+    drawn_map = {
+        class_name: class_info
+        for class_name, class_info in class_map.items()
+        if not class_info.skipped
+    }
+    if fast is None:
+        fast = len(drawn_map) > _LARGE_GRAPH_NODES
+    if fast:
+        dot_lines.append(f"graph [{_LARGE_GRAPH_ATTRS}];")
     color_palette = [
         "#FF9999",
         "#99FF99",
@@ -305,41 +746,50 @@ def visualize_schemas(  # noqa C901
         "#99CCFF",
         "#CCCCCC",
     ]
-    color_index = 0
 
     # Assign colors to modules
-    modules = set(info["module"] for info in class_map.values() if info["module"])
-    for module in sorted(modules):
-        module_colors[module] = color_palette[color_index % len(color_palette)]
-        color_index += 1
-
-    # Create nodes
-    for class_name, class_info in class_map.items():
-        sanitized_class_name = sanitize_name(class_name)
-        fields = class_info["fields"]
-        module = class_info.get("module")
+    modules = sorted({info.module for info in drawn_map.values() if info.module})
+    module_colors = dict(zip(modules, itertools.cycle(color_palette)))
+
+    # Sanitize each class name once; the names double as node ids and edge endpoints
+    sanitized = {class_name: sanitize_name(class_name) for class_name in drawn_map}
+    edges_to_add = []
+    add_line = dot_lines.append
+    add_edge = edges_to_add.append
+
+    # Create nodes, collecting edges until every node exists
+    for class_name, class_info in drawn_map.items():
+        sanitized_class_name = sanitized[class_name]
+        fields = class_info.fields
+        module = class_info.module
         color = module_colors.get(module, "#CCCCCC")
+        label_name = class_name.translate(_HTML_ESCAPES)
 
         if fields:
-            if class_info.get("is_enum"):
+            if class_info.is_enum:
                 # Create a label for the enum node
-                label = f"""<<TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0">
-                <TR><TD BGCOLOR="{color}" COLSPAN="1"><B>{class_name} (Enum)</B></TD></TR>"""
-                for member_name in fields.keys():
-                    label += f"""<TR>
-                    <TD>{member_name}</TD>
-                    </TR>"""
-                label += "</TABLE>>"
-                G.add_node(sanitized_class_name, shape="plaintext", label=label)
+                parts = [
+                    '<<TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0">',
+                    f'<TR><TD BGCOLOR="{color}" COLSPAN="1"><B>{label_name} (Enum)</B></TD></TR>',
+                ]
+                parts.extend(
+                    f"<TR><TD>{member_name.translate(_HTML_ESCAPES)}</TD></TR>"
+                    for member_name in fields
+                )
+                parts.append("</TABLE>>")
+                label = "".join(parts)
+                add_line(f'"{sanitized_class_name}" [shape=plaintext, label={label}];')
             else:
                 # Create a label for the node with fields
-                label = f"""<<TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0">
-                <TR><TD PORT="class_header" BGCOLOR="{color}" COLSPAN="2"><B>{class_name}</B></TD></TR>"""
+                parts = [
+                    '<<TABLE BORDER="1" CELLBORDER="1" CELLSPACING="0">',
+                    f'<TR><TD PORT="class_header" BGCOLOR="{color}" COLSPAN="2"><B>{label_name}</B></TD></TR>',
+                ]
                 for field_name, field_info in fields.items():
                     sanitized_field_name = sanitize_name(field_name)
-                    display_type = field_info["type"]["display"]
-                    default_value = field_info["default"]
-                    has_default = field_info["has_default"]
+                    display_type = field_info.type_display
+                    default_value = field_info.default
+                    has_default = field_info.has_default
                     if has_default:
                         # Append default value to type, handling Enum and 'default_factory'
                         if isinstance(default_value, Enum):
@@ -349,95 +799,154 @@ def visualize_schemas(  # noqa C901
                             display_type += " = <default_factory>"
                         else:
                             display_type += f" = {repr(default_value)}"
-                        print(
-                            f"Field '{class_name}.{field_name}' has default: {display_type}"
+                        logger.debug(
+                            "Field '%s.%s' has default: %s",
+                            class_name,
+                            field_name,
+                            display_type,
                         )
                     else:
                         # Indicate no default value
-                        print(f"Field '{class_name}.{field_name}' has no default.")
-                    label += f"""<TR>
-                    <TD>{field_name}</TD>
-                    <TD PORT="{sanitized_field_name}_type">{display_type}</TD>
-                    </TR>"""
-                label += "</TABLE>>"
-                G.add_node(sanitized_class_name, shape="plaintext", label=label)
+                        logger.debug(
+                            "Field '%s.%s' has no default.", class_name, field_name
+                        )
+                    label_field_name = field_name.translate(_HTML_ESCAPES)
+                    label_type = display_type.translate(_HTML_ESCAPES)
+                    parts.append(
+                        f"<TR><TD>{label_field_name}</TD>"
+                        f'<TD PORT="{sanitized_field_name}_type">{label_type}</TD></TR>'
+                    )
+                    for base_type_name in field_info.type_bases:
+                        add_edge(
+                            (sanitized_class_name, sanitized_field_name, base_type_name)
+                        )
+                parts.append("</TABLE>>")
+                label = "".join(parts)
+                add_line(f'"{sanitized_class_name}" [shape=plaintext, label={label}];')
         else:
             # Create a placeholder node
-            G.add_node(
-                sanitized_class_name, shape="box", style="dashed", label=class_name
+            add_line(
+                f'"{sanitized_class_name}" [shape=box, style=dashed, '
+                f"label={_dot_quote(class_name)}];"
             )
-        print(f"Added node: {sanitized_class_name}")
-
-    # Create edges
-    for class_name, class_info in class_map.items():
-        sanitized_class_name = sanitize_name(class_name)
-        fields = class_info["fields"]
-        for field_name, field_info in fields.items():
-            for base_type_name in field_info["type"]["types"]:
-                if base_type_name and base_type_name not in BUILTIN_TYPES:
-                    sanitized_base_type = sanitize_name(base_type_name)
-                    sanitized_field_name = sanitize_name(field_name)
-                    if sanitized_base_type in G.nodes():
-                        # Use tailport and headport for proper edge positioning
-                        G.add_edge(
-                            sanitized_class_name,
-                            sanitized_base_type,
-                            tailport=f"{sanitized_field_name}_type",
-                            headport="class_header",
-                            arrowhead="normal",
-                        )
-                        print(
-                            f"Adding edge from '{sanitized_class_name}:{sanitized_field_name}_type' \
-                                to '{sanitized_base_type}'"
-                        )
-                    else:
-                        print(
-                            f"Warning: Node '{sanitized_base_type}' does not exist in the graph."
-                        )
-                else:
-                    print(
-                        f"Skipping built-in type '{base_type_name}' or unresolved type."
-                    )
+        logger.debug("Added node: %s", sanitized_class_name)
+
+    # Create edges, skipping repeats of the same field-to-class reference
+    seen_edges = set()
+    undrawn_types = BUILTIN_TYPES.union(
+        class_name for class_name, class_info in class_map.items() if class_info.skipped
+    )
+    for sanitized_class_name, sanitized_field_name, base_type_name in edges_to_add:
+        if base_type_name and base_type_name not in undrawn_types:
+            # Every class_map entry has a node, so a hit means the target exists
+            sanitized_base_type = sanitized.get(base_type_name)
+            if sanitized_base_type is not None:
+                edge_key = (
+                    sanitized_class_name,
+                    sanitized_base_type,
+                    sanitized_field_name,
+                )
+                if edge_key in seen_edges:
+                    continue
+                seen_edges.add(edge_key)
+                # Use tailport and headport for proper edge positioning
+                add_line(
+                    f'"{sanitized_class_name}" -> "{sanitized_base_type}" '
+                    f'[tailport="{sanitized_field_name}_type", '
+                    "headport=class_header, arrowhead=normal];"
+                )
+                logger.debug(
+                    "Adding edge from '%s:%s_type' to '%s'",
+                    sanitized_class_name,
+                    sanitized_field_name,
+                    sanitized_base_type,
+                )
+            else:
+                logger.warning(
+                    "Node '%s' does not exist in the graph.",
+                    sanitize_name(base_type_name),
+                )
+        else:
+            logger.debug("Skipping built-in or skipped type '%s'.", base_type_name)
 
     # Add legend node
-    legend_label = """<<TABLE BORDER="0" CELLBORDER="1" CELLSPACING="0">
-    <TR><TD COLSPAN="2"><B>Legend</B></TD></TR>"""
-
-    for module, color in module_colors.items():
-        legend_label += f"""<TR>
-        <TD BGCOLOR="{color}">&nbsp;&nbsp;&nbsp;&nbsp;</TD>
-        <TD>{module}</TD>
-        </TR>"""
-    legend_label += "</TABLE>>"
-
-    G.add_node("Legend", shape="plaintext", label=legend_label)
-    G.add_edge("Legend", "Legend", style="invis", constraint="false")
-
-    # Adjust graph attributes
-    G.graph_attr.update(label="Schemas Diagram", labelloc="t")
-
-    # Render the graph
-    G.layout(prog="dot")
-    G.draw(filename)
-    print("\nGraph Nodes:")
-    for node in G.nodes():
-        print(node)
-
-    print("\nGraph Edges:")
-    for edge in G.edges():
-        print(edge)
-
-
-def main() -> None:
+    legend_parts = [
+        '<<TABLE BORDER="0" CELLBORDER="1" CELLSPACING="0">',
+        '<TR><TD COLSPAN="2"><B>Legend</B></TD></TR>',
+    ]
+    legend_parts.extend(
+        f'<TR><TD BGCOLOR="{color}">&nbsp;&nbsp;&nbsp;&nbsp;</TD><TD>{module.translate(_HTML_ESCAPES)}</TD></TR>'
+        for module, color in module_colors.items()
+    )
+    legend_parts.append("</TABLE>>")
+    legend_label = "".join(legend_parts)
+
+    dot_lines.append(f"Legend [shape=plaintext, label={legend_label}];")
+    dot_lines.append("Legend -> Legend [style=invis, constraint=false];")
+    dot_lines.append("}")
+
+    # Hand the whole graph to Graphviz at once and render it
+    G = pgv.AGraph(string="\n".join(dot_lines))
+    if engine is None:
+        engine = "sfdp" if len(drawn_map) > _LARGE_GRAPH_NODES else "dot"
+    G.layout(prog=engine)
+    G.draw(filename, format=output_format)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Graph Nodes:\n%s", "\n".join(G.nodes()))
+        logger.debug("Graph Edges:\n%s", "\n".join(map(str, G.edges())))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Define all schemas module and run main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="log per-class, per-field, and per-edge diagnostics",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="schemas.svg",
+        help="file to render the diagram to; its extension picks the format "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            f"rebuild the class map instead of reusing {_CACHE_DIR}/, which"
+            " only tracks the requested packages' own source files"
+        ),
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        default=None,
+        help="cap Graphviz layout iterations (default: only for large graphs)",
+    )
+    parser.add_argument(
+        "--engine",
+        help='Graphviz layout program (default: "dot", or "sfdp" for large graphs)',
+    )
+    args = parser.parse_args(argv)
+
     # Specify the modules you want to include
     module_names = [
         "schemas.comment",
         # Add other modules as needed
     ]
 
-    class_map = build_class_map(module_names)
-    visualize_schemas(class_map)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+    )
+    if args.no_cache:
+        class_map = build_class_map(module_names)
+    else:
+        class_map = load_class_map(module_names)
+    visualize_schemas(class_map, args.output, fast=args.fast, engine=args.engine)
 
 
 if __name__ == "__main__":
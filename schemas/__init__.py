@@ -1,4 +1,40 @@
-from schemas.post import Post
-from schemas.user import Address, User
+"""Schema models, imported from their submodules on first access."""
 
-__all__ = ["Address", "User", "Post"]
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from schemas.post import Post, PostAdapter, PostListAdapter
+    from schemas.user import Address, User
+
+_LAZY_IMPORTS = {
+    "Address": "schemas.user",
+    "User": "schemas.user",
+    "Post": "schemas.post",
+    "PostAdapter": "schemas.post",
+    "PostListAdapter": "schemas.post",
+}
+
+__all__ = ["Address", "User", "Post", "PostAdapter", "PostListAdapter"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported name from its submodule the first time it is used."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the exports, module dunders and loaded submodules, not helper imports."""
+    names = set(__all__)
+    for name, value in globals().items():
+        if name.startswith("__") or (
+            isinstance(value, ModuleType) and value.__name__.startswith(f"{__name__}.")
+        ):
+            names.add(name)
+    return sorted(names)
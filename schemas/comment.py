@@ -2,7 +2,7 @@
 
 from enum import StrEnum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from schemas.post import Post
 from schemas.user import User
@@ -11,6 +11,8 @@ from schemas.user import User
 class Comment(BaseModel):
     """Comment schema."""
 
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     content: str
     author: User
@@ -28,4 +30,6 @@ class Health(StrEnum):
 class HealthCheck(BaseModel):
     """Health check schema."""
 
+    model_config = ConfigDict(defer_build=True)
+
     status: Health = Health.unknown
@@ -1,8 +1,11 @@
 """This module contains the schema for the post model."""
 
-from typing import List, Optional, Union
+from __future__ import annotations
 
-from pydantic import BaseModel
+import sys
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 from schemas.user import User
 
@@ -10,8 +13,36 @@ from schemas.user import User
 class Post(BaseModel):
     """Post schema."""
 
+    model_config = ConfigDict(defer_build=True)
+
     id: int
-    title: Optional[str]
-    content: Union[str, None]
+    title: str | None = Field(default=None, max_length=512)
+    content: str | None = None
     author: User
-    tags: List[str]
+    tags: tuple[str, ...] = Field(default=(), max_length=64)
+
+    @field_validator("tags")
+    @classmethod
+    def _intern_tags(cls, tags: tuple[str, ...]) -> tuple[str, ...]:
+        """Intern tag strings, so posts with the same tags share their strings."""
+        return tuple([sys.intern(tag) for tag in tags])
+
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> Post:
+        """Build a Post, and its author, from already-validated data."""
+        fields = dict(data)
+        if "author" in fields:
+            fields["author"] = User.from_trusted(fields["author"])
+        if "tags" in fields:
+            fields["tags"] = tuple(fields["tags"])
+        return cls.model_construct(**fields)
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> Post:
+        """Validate a Post straight from JSON, without an intermediate dict."""
+        return cls.model_validate_json(data)
+
+
+# Shared adapters; a TypeAdapter created per call would rebuild its core schema
+PostAdapter = TypeAdapter(Post)
+PostListAdapter = TypeAdapter(List[Post], config=ConfigDict(defer_build=True))
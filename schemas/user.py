@@ -1,13 +1,17 @@
 """User schema module."""
 
-from typing import List, Optional, Union
+from __future__ import annotations
 
-from pydantic import BaseModel
+from typing import Any, Dict
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Address(BaseModel):
     """Address schema."""
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     street: str
     city: str
     zipcode: str = "00000"
@@ -16,9 +20,23 @@ class Address(BaseModel):
 class User(BaseModel):
     """User schema."""
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     id: int = 0
     name: str = "John Doe"
-    email: str
-    addresses: List[Address]
-    nickname: Optional[str] = None
-    status: Union[str, None] = "active"
+    email: str = Field(
+        strict=True, min_length=3, max_length=254, pattern=r"^[^@]+@[^@]+$"
+    )
+    addresses: tuple[Address, ...]
+    nickname: str | None = None
+    status: str | None = "active"
+
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> User:
+        """Build a User, and its addresses, from already-validated data."""
+        fields = dict(data)
+        if "addresses" in fields:
+            fields["addresses"] = tuple(
+                Address.model_construct(**address) for address in fields["addresses"]
+            )
+        return cls.model_construct(**fields)
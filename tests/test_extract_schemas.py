@@ -0,0 +1,333 @@
+"""Tests for extract_schemas."""
+
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extract_schemas  # noqa: E402
+
+
+class BuildClassMapTest(unittest.TestCase):
+    """build_class_map over throwaway modules written to a temporary directory."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        sys.path.insert(0, self._tmp.name)
+        self._modules_before = set(sys.modules)
+        extract_schemas._safe_import.cache_clear()
+        extract_schemas._resolve_class.cache_clear()
+
+    def tearDown(self) -> None:
+        sys.path.remove(self._tmp.name)
+        for name in set(sys.modules) - self._modules_before:
+            del sys.modules[name]
+        extract_schemas._safe_import.cache_clear()
+        extract_schemas._resolve_class.cache_clear()
+        self._tmp.cleanup()
+
+    def write_module(self, name: str, source: str) -> None:
+        path = os.path.join(self._tmp.name, f"{name}.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(source))
+
+    def render_dot(self, class_map: dict) -> str:
+        path = os.path.join(self._tmp.name, "diagram.dot")
+        extract_schemas.visualize_schemas(class_map, path, output_format="dot")
+        with open(path) as f:
+            return f.read()
+
+    def test_failing_fallback_import_becomes_placeholder(self) -> None:
+        # The referenced Widget class is not reachable from its referencing
+        # module, so resolution falls back to importing a module named Widget,
+        # whose body raises
+        self.write_module("Widget", 'raise RuntimeError("broken widget module")\n')
+        self.write_module(
+            "holder",
+            """
+            def _make_widget():
+                class Widget:
+                    size: int
+
+                return Widget
+
+
+            class Holder:
+                widget: _make_widget()
+                name: str
+            """,
+        )
+
+        with self.assertLogs(extract_schemas.logger, "WARNING") as logs:
+            class_map = extract_schemas.build_class_map(["holder"])
+
+        self.assertIn("Holder", class_map)
+        self.assertEqual(set(class_map["Holder"].fields), {"widget", "name"})
+        placeholder = class_map["Widget"]
+        self.assertEqual(placeholder.fields, {})
+        self.assertIsNone(placeholder.module)
+        self.assertTrue(
+            any("Error importing module Widget" in line for line in logs.output)
+        )
+
+    def test_unresolvable_annotation_keeps_the_others_evaluated(self) -> None:
+        self.write_module(
+            "partial",
+            """
+            from __future__ import annotations
+
+
+            class Partial:
+                count: int
+                later: NotDefinedAnywhere
+            """,
+        )
+
+        class_map = extract_schemas.build_class_map(["partial"])
+
+        fields = class_map["Partial"].fields
+        self.assertEqual(fields["count"].type_bases, ("int",))
+        self.assertEqual(fields["later"].type_display, "NotDefinedAnywhere")
+        self.assertEqual(fields["later"].type_bases, ())
+
+    def test_cache_skips_builds_with_failed_imports(self) -> None:
+        self.write_module(
+            "plain",
+            """
+            from typing import Literal
+
+
+            class Plain:
+                name: str
+                kind: Literal["a", "b"]
+            """,
+        )
+        cache_dir = os.path.join(self._tmp.name, "cache")
+
+        with self.assertLogs(extract_schemas.logger, "WARNING"):
+            extract_schemas.load_class_map(["plain", "missing"], cache_dir=cache_dir)
+        self.assertFalse(os.path.exists(cache_dir))
+
+        # The unresolved Literal placeholder is deterministic, so still cached
+        with self.assertLogs(extract_schemas.logger, "WARNING") as logs:
+            class_map = extract_schemas.load_class_map(["plain"], cache_dir=cache_dir)
+        self.assertTrue(any("Could not resolve" in line for line in logs.output))
+        self.assertTrue(os.path.exists(os.path.join(cache_dir, "class_map.key")))
+        with self.assertNoLogs(extract_schemas.logger, "WARNING"):
+            cached = extract_schemas.load_class_map(["plain"], cache_dir=cache_dir)
+        self.assertEqual(cached, class_map)
+
+    def test_classes_named_like_stdlib_types_are_followed(self) -> None:
+        self.write_module(
+            "sports",
+            """
+            from pydantic import BaseModel
+
+
+            class Match(BaseModel):
+                score: int
+
+
+            class Counter(BaseModel):
+                total: int
+            """,
+        )
+        self.write_module(
+            "game",
+            """
+            import datetime
+
+            from pydantic import BaseModel
+
+            from sports import Counter, Match
+
+
+            class Game(BaseModel):
+                match: Match
+                counter: Counter
+                played_at: datetime.datetime
+            """,
+        )
+
+        with self.assertNoLogs(extract_schemas.logger, "WARNING"):
+            class_map = extract_schemas.build_class_map(["game"])
+            dot = self.render_dot(class_map)
+
+        self.assertEqual(set(class_map["Match"].fields), {"score"})
+        self.assertEqual(set(class_map["Counter"].fields), {"total"})
+        self.assertTrue(class_map["datetime"].skipped)
+        self.assertIn("Game:match_type -> Match:class_header", dot)
+        self.assertIn("Game:counter_type -> Counter:class_header", dot)
+        self.assertNotIn("datetime [", dot)
+
+    def test_skip_types_are_neither_followed_nor_drawn(self) -> None:
+        self.write_module(
+            "external",
+            "from pydantic import BaseModel\n\n\nclass Ext(BaseModel):\n    x: int\n",
+        )
+        self.write_module(
+            "uses_ext",
+            """
+            from pydantic import BaseModel
+
+            from external import Ext
+
+
+            class Holder(BaseModel):
+                ext: Ext
+            """,
+        )
+
+        with self.assertNoLogs(extract_schemas.logger, "WARNING"):
+            class_map = extract_schemas.build_class_map(
+                ["uses_ext"], skip_types=["Ext"]
+            )
+            dot = self.render_dot(class_map)
+
+        self.assertTrue(class_map["Ext"].skipped)
+        self.assertNotIn("Ext [", dot)
+        self.assertNotIn("-> Ext", dot)
+
+    def test_reference_resolves_to_the_referencing_modules_binding(self) -> None:
+        self.write_module(
+            "ext",
+            """
+            from enum import Enum
+
+
+            class Status(Enum):
+                ACTIVE = "active"
+                RETIRED = "retired"
+            """,
+        )
+        self.write_module(
+            "b",
+            """
+            from pydantic import BaseModel
+
+            from ext import Status
+
+
+            class Item(BaseModel):
+                status: Status
+            """,
+        )
+        self.write_module(
+            "a",
+            """
+            from enum import Enum
+
+
+            class Status(Enum):
+                DRAFT = "draft"
+                PUBLISHED = "published"
+            """,
+        )
+
+        with self.assertLogs(extract_schemas.logger, "WARNING") as logs:
+            class_map = extract_schemas.build_class_map(["b", "a"])
+
+        self.assertEqual(class_map["Status"].module, "ext")
+        self.assertEqual(set(class_map["Status"].fields), {"ACTIVE", "RETIRED"})
+        self.assertTrue(
+            any("Skipping a.Status: ext.Status" in line for line in logs.output)
+        )
+
+    def test_unresolvable_dataclass_annotation_keeps_the_others(self) -> None:
+        self.write_module(
+            "partial_dc",
+            """
+            from __future__ import annotations
+
+            from dataclasses import dataclass
+
+
+            @dataclass
+            class Child:
+                name: str
+
+
+            @dataclass
+            class Parent:
+                child: Child
+                later: NotDefinedAnywhere
+            """,
+        )
+
+        class_map = extract_schemas.build_class_map(["partial_dc"])
+
+        fields = class_map["Parent"].fields
+        self.assertEqual(fields["child"].type_bases, ("Child",))
+        self.assertEqual(fields["later"].type_display, "NotDefinedAnywhere")
+        self.assertEqual(fields["later"].type_bases, ())
+
+    def test_tuple_and_pipe_union_fields_reference_their_classes(self) -> None:
+        self.write_module(
+            "shapes",
+            """
+            from typing import Tuple
+
+            from pydantic import BaseModel
+
+
+            class Foo(BaseModel):
+                x: int
+
+
+            class Holder(BaseModel):
+                pair: Tuple[int, Foo]
+                many: tuple[Foo, ...]
+                maybe: Foo | None = None
+            """,
+        )
+
+        class_map = extract_schemas.build_class_map(["shapes"])
+        dot = self.render_dot(class_map)
+
+        fields = class_map["Holder"].fields
+        self.assertEqual(fields["pair"].type_display, "Tuple[int, Foo]")
+        self.assertEqual(fields["pair"].type_bases, ("int", "Foo"))
+        self.assertEqual(fields["many"].type_display, "Tuple[Foo, ...]")
+        self.assertEqual(fields["many"].type_bases, ("Foo",))
+        self.assertEqual(fields["maybe"].type_display, "Optional[Foo]")
+        for field_name in ("pair", "many", "maybe"):
+            self.assertIn(f"Holder:{field_name}_type -> Foo:class_header", dot)
+
+    def test_label_text_is_html_escaped(self) -> None:
+        self.write_module(
+            "escaped",
+            """
+            class Markup:
+                tag: str = "<b>&nbsp;"
+            """,
+        )
+
+        class_map = extract_schemas.build_class_map(["escaped"])
+        dot = self.render_dot(class_map)
+
+        self.assertIn("str = '&lt;b&gt;&amp;nbsp;'", dot)
+        self.assertNotIn("<b>&nbsp;", dot)
+
+    def test_same_named_classes_warn_and_keep_the_first(self) -> None:
+        self.write_module("first", "class Shared:\n    one: int\n")
+        self.write_module("second", "class Shared:\n    two: int\n")
+
+        with self.assertLogs(extract_schemas.logger, "WARNING") as logs:
+            class_map = extract_schemas.build_class_map(["first", "second"])
+
+        self.assertEqual(class_map["Shared"].module, "first")
+        self.assertEqual(set(class_map["Shared"].fields), {"one"})
+        self.assertEqual(
+            logs.output,
+            [
+                "WARNING:extract_schemas:Skipping second.Shared: first.Shared is"
+                " already mapped under that name"
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()